@@ -3,9 +3,7 @@ Streamlit Dashboard for Rocket League AI Coach
 """
 
 import streamlit as st
-import sys
-
-sys.path.insert(0, 'src')
+import pandas as pd
 
 from src.database import RocketLeagueDB
 from src.data_collection import BallchasingAPI
@@ -16,7 +14,8 @@ try:
     GROQ_API_KEY = st.secrets["GROQ_API_KEY"]
 except:
     from config import BALLCHASING_API_KEY, GROQ_API_KEY
-from src.ai_coach import AICoach
+
+DB_PATH = "data/rl_stats.db"
 
 # Page config
 st.set_page_config(
@@ -24,6 +23,68 @@ st.set_page_config(
     layout="wide"
 )
 
+
+@st.cache_resource
+def get_db(db_path):
+    """Shared database handle and its connection, created once per server process"""
+    return RocketLeagueDB(db_path=db_path)
+
+
+@st.cache_data(ttl=3600)
+def load_stats(player_name):
+    """Player match history (None if not stored), memoized across reruns"""
+    return get_db(DB_PATH).fetch_or_none(player_name)
+
+
+@st.cache_data(ttl=3600)
+def compute_analytics(player_name):
+    """Derived analytics for a player, memoized across reruns"""
+    stats_df = load_stats(player_name)
+    if stats_df is None:
+        # Player not stored: nothing to analyze
+        return {
+            "summary": {},
+            "playlist_stats": {},
+            "recent_form": {},
+            "comparison": {},
+            "strengths": {},
+            "df_hash": None,
+        }
+
+    analytics = PlayerAnalytics(stats_df)
+    return {
+        "summary": get_db(DB_PATH).get_summary_stats(player_name),
+        "playlist_stats": analytics.get_stats_by_playlist(),
+        "recent_form": analytics.get_recent_form(10),
+        "comparison": analytics.compare_performance(first_n=10, last_n=10) if len(stats_df) >= 20 else {},
+        "strengths": analytics.get_strengths_and_weaknesses(),
+        "df_hash": int(pd.util.hash_pandas_object(stats_df, index=True).sum()),
+    }
+
+
+@st.cache_resource(ttl=3600)
+def build_figures(player_name, df_hash):
+    """
+    Plotly figures for a player, rebuilt only when the data hash changes
+
+    Kept as a resource rather than cache_data: reruns get the same Figure
+    objects back instead of unpickling copies, which would re-run plotly's
+    property validation and cost more than building the figures. Callers
+    must not mutate them.
+    """
+    stats_df = load_stats(player_name)
+    if stats_df is None:
+        return {}
+
+    computed = compute_analytics(player_name)
+    viz = PlayerVisualizations(stats_df, player_name)
+    return viz.create_all_visualizations(
+        computed["summary"],
+        computed["playlist_stats"],
+        computed["comparison"]
+    )
+
+
 # Initialize session state
 if 'analyzed_player' not in st.session_state:
     st.session_state.analyzed_player = None
@@ -78,11 +139,13 @@ if analyze_button and player_name:
     with st.spinner(f"Analyzing {player_name}..."):
         try:
             # Initialize
-            db = RocketLeagueDB(db_path="data/rl_stats.db")
+            db = get_db(DB_PATH)
             api = BallchasingAPI(BALLCHASING_API_KEY)
 
-            # Check if player exists in database
-            if not db.player_exists(player_name):
+            # Load stored data; None means the player isn't in the database yet
+            stats_df = load_stats(player_name)
+
+            if stats_df is None:
                 st.info(f"Fetching data for {player_name} from Ballchasing...")
 
                 # Fetch data
@@ -95,31 +158,19 @@ if analyze_button and player_name:
 
                 # Store in database
                 db.add_match_history(player_name, match_history)
+                st.cache_data.clear()
                 st.success(f"Fetched {len(match_history)} games!")
+                stats_df = load_stats(player_name)
             else:
                 st.info(f"Loading existing data for {player_name}")
 
-            # Get stats
-            stats_df = db.get_player_stats(player_name)
-
-            if len(stats_df) == 0:
+            if stats_df is None:
                 st.error(f"No data found for {player_name}")
                 st.stop()
 
             # Store in session
             st.session_state.analyzed_player = player_name
 
-            # Create analytics
-            analytics = PlayerAnalytics(stats_df)
-            summary = analytics.get_summary_stats()
-            playlist_stats = analytics.get_stats_by_playlist()
-            recent_form = analytics.get_recent_form(10)
-            comparison = analytics.compare_performance(first_n=10, last_n=10) if len(stats_df) >= 20 else {}
-            strengths = analytics.get_strengths_and_weaknesses()
-
-            # Create visualizations
-            viz = PlayerVisualizations(stats_df, player_name)
-
             st.success(f"Analysis complete for {player_name}!")
 
         except Exception as e:
@@ -128,18 +179,19 @@ if analyze_button and player_name:
 
 # Display results if we have an analyzed player
 if st.session_state.analyzed_player:
+    # Only needed once there are results to coach on
+    from src.ai_coach import AICoach
+
     player_name = st.session_state.analyzed_player
 
-    # Reload data
-    db = RocketLeagueDB(db_path="data/rl_stats.db")
-    stats_df = db.get_player_stats(player_name)
-    analytics = PlayerAnalytics(stats_df)
-    summary = analytics.get_summary_stats()
-    playlist_stats = analytics.get_stats_by_playlist()
-    recent_form = analytics.get_recent_form(10)
-    comparison = analytics.compare_performance(first_n=10, last_n=10) if len(stats_df) >= 20 else {}
-    strengths = analytics.get_strengths_and_weaknesses()
-    viz = PlayerVisualizations(stats_df, player_name)
+    # Load cached data
+    computed = compute_analytics(player_name)
+    summary = computed["summary"]
+    playlist_stats = computed["playlist_stats"]
+    recent_form = computed["recent_form"]
+    comparison = computed["comparison"]
+    strengths = computed["strengths"]
+    figures = build_figures(player_name, computed["df_hash"])
 
     # Overview Section
     st.header(f"{player_name} - Performance Overview")
@@ -168,22 +220,18 @@ if st.session_state.analyzed_player:
 
     with tab1:
         st.subheader("Performance Over Time")
-        fig_timeline = viz.create_performance_timeline()
-        st.plotly_chart(fig_timeline, use_container_width=True)
+        st.plotly_chart(figures["timeline"], use_container_width=True, key=f"timeline-{player_name}")
 
         col1, col2 = st.columns(2)
         with col1:
-            fig_score = viz.create_score_distribution()
-            st.plotly_chart(fig_score, use_container_width=True)
+            st.plotly_chart(figures["score_dist"], use_container_width=True, key=f"score-{player_name}")
         with col2:
-            fig_win_loss = viz.create_win_loss_chart(summary)
-            st.plotly_chart(fig_win_loss, use_container_width=True)
+            st.plotly_chart(figures["win_loss"], use_container_width=True, key=f"win-loss-{player_name}")
 
     with tab2:
         col1, col2 = st.columns([1, 1])
         with col1:
-            fig_radar = viz.create_stats_radar(summary)
-            st.plotly_chart(fig_radar, use_container_width=True)
+            st.plotly_chart(figures["radar"], use_container_width=True, key=f"radar-{player_name}")
 
         with col2:
             st.subheader("Detailed Stats")
@@ -195,8 +243,7 @@ if st.session_state.analyzed_player:
 
     with tab3:
         if playlist_stats:
-            fig_playlist = viz.create_playlist_comparison(playlist_stats)
-            st.plotly_chart(fig_playlist, use_container_width=True)
+            st.plotly_chart(figures["playlist"], use_container_width=True, key=f"playlist-{player_name}")
 
             st.subheader("Stats by Game Mode")
             for playlist, stats in playlist_stats.items():
@@ -216,8 +263,7 @@ if st.session_state.analyzed_player:
 
     with tab4:
         if comparison:
-            fig_improvement = viz.create_improvement_chart(comparison)
-            st.plotly_chart(fig_improvement, use_container_width=True)
+            st.plotly_chart(figures["improvement"], use_container_width=True, key=f"improvement-{player_name}")
 
             col1, col2 = st.columns(2)
             with col1:
@@ -247,35 +293,30 @@ if st.session_state.analyzed_player:
     with col1:
         st.markdown("**Get personalized coaching tips powered by AI**")
 
-        if st.button("Generate AI Coaching", type="primary", use_container_width=True):
-            with st.spinner("AI Coach is analyzing your gameplay..."):
-                try:
-                    coach = AICoach()
-                    coaching_tips = coach.generate_coaching_tips(
-                        summary,
-                        recent_form,
-                        strengths,
-                        playlist_stats
-                    )
-                    st.session_state['coaching_tips'] = coaching_tips
-                except Exception as e:
-                    st.error(f"Error generating coaching: {str(e)}")
+        generate_coaching = st.button("Generate AI Coaching", type="primary", use_container_width=True)
 
     with col2:
         st.markdown("**Quick Tips**")
-        try:
-            coach = AICoach()
-            quick_tips = coach.generate_quick_tips(summary)
-            for tip in quick_tips:
-                st.info(tip)
-        except:
-            pass
-
-    # Display AI coaching if generated
-    if 'coaching_tips' in st.session_state:
+        for tip in AICoach.generate_quick_tips(summary):
+            st.info(tip)
+
+    # Display AI coaching, streaming it in as it is generated
+    if generate_coaching or 'coaching_tips' in st.session_state:
         st.markdown("---")
         st.subheader("Your Personalized Coaching Plan")
-        st.markdown(st.session_state['coaching_tips'])
+        if generate_coaching:
+            try:
+                coach = AICoach(GROQ_API_KEY)
+                st.session_state['coaching_tips'] = st.write_stream(coach.stream_coaching_tips(
+                    summary,
+                    recent_form,
+                    strengths,
+                    playlist_stats
+                ))
+            except Exception as e:
+                st.error(f"Error generating coaching: {str(e)}")
+        else:
+            st.markdown(st.session_state['coaching_tips'])
 
     st.divider()
 
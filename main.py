@@ -4,20 +4,48 @@ Main script to fetch and store player data
 
 import sys
 
-sys.path.insert(0, 'src')
+import pandas as pd
 
 from src.data_collection import BallchasingAPI
 from src.database import RocketLeagueDB
 from config import BALLCHASING_API_KEY
 
 
-def analyze_player(player_name: str, num_games: int = 30):
+def print_summary(player_name: str, stats_df: pd.DataFrame):
+    """
+    Print a summary of a player's stored games in a single write
+
+    Args:
+        player_name: Name of the player
+        stats_df: DataFrame from RocketLeagueDB.get_player_stats()
+    """
+    # One aggregation call for every reported average
+    means = stats_df.agg({"goals": "mean", "assists": "mean", "saves": "mean",
+                          "score": "mean", "won": "mean"})
+    line = '=' * 50
+
+    sys.stdout.write(
+        f"\n{line}\n"
+        f"SUMMARY FOR {player_name}\n"
+        f"{line}\n"
+        f"Total games: {len(stats_df)}\n"
+        f"Average goals: {means['goals']:.2f}\n"
+        f"Average assists: {means['assists']:.2f}\n"
+        f"Average saves: {means['saves']:.2f}\n"
+        f"Win rate: {means['won'] * 100:.1f}%\n"
+        f"Average score: {means['score']:.0f}\n"
+        f"{line}\n\n"
+    )
+
+
+def analyze_player(player_name: str, num_games: int = 30, db: RocketLeagueDB = None):
     """
     Fetch and store player data
 
     Args:
         player_name: Name of player to analyze
         num_games: Number of recent games to fetch
+        db: Database to use; pass one shared instance when analyzing a batch
     """
     print(f"\n{'=' * 50}")
     print(f"ANALYZING PLAYER: {player_name}")
@@ -25,28 +53,20 @@ def analyze_player(player_name: str, num_games: int = 30):
 
     # Initialize API and database
     api = BallchasingAPI(BALLCHASING_API_KEY)
-    db = RocketLeagueDB(db_path="data/rl_stats.db")
+    if db is None:
+        db = RocketLeagueDB(db_path="data/rl_stats.db")
 
-    # Check if we already have data
-    if db.player_exists(player_name):
+    # Check if we already have data; None means no games are stored
+    stats_df = db.fetch_or_none(player_name)
+    if stats_df is not None:
         print(f"ℹ️  Player {player_name} already in database")
         print(f"Current data:")
-        stats_df = db.get_player_stats(player_name)
         print(f"  - {len(stats_df)} games stored")
         print()
         response = input("Fetch new data anyway? (y/n): ")
         if response.lower() != 'y':
             print("Using existing data...")
-            print(f"\n{'=' * 50}")
-            print(f"SUMMARY FOR {player_name}")
-            print(f"{'=' * 50}")
-            print(f"Total games: {len(stats_df)}")
-            print(f"Average goals: {stats_df['goals'].mean():.2f}")
-            print(f"Average assists: {stats_df['assists'].mean():.2f}")
-            print(f"Average saves: {stats_df['saves'].mean():.2f}")
-            print(f"Win rate: {(stats_df['won'].sum() / len(stats_df) * 100):.1f}%")
-            print(f"Average score: {stats_df['score'].mean():.0f}")
-            print(f"{'=' * 50}\n")
+            print_summary(player_name, stats_df)
             return
 
     # Fetch match history from API
@@ -61,16 +81,7 @@ def analyze_player(player_name: str, num_games: int = 30):
 
     # Display summary
     stats_df = db.get_player_stats(player_name)
-    print(f"\n{'=' * 50}")
-    print(f"SUMMARY FOR {player_name}")
-    print(f"{'=' * 50}")
-    print(f"Total games: {len(stats_df)}")
-    print(f"Average goals: {stats_df['goals'].mean():.2f}")
-    print(f"Average assists: {stats_df['assists'].mean():.2f}")
-    print(f"Average saves: {stats_df['saves'].mean():.2f}")
-    print(f"Win rate: {(stats_df['won'].sum() / len(stats_df) * 100):.1f}%")
-    print(f"Average score: {stats_df['score'].mean():.0f}")
-    print(f"{'=' * 50}\n")
+    print_summary(player_name, stats_df)
 
 
 if __name__ == "__main__":
@@ -80,9 +91,12 @@ if __name__ == "__main__":
         "justin.",
     ]
 
+    # One database and connection shared by the whole batch
+    db = RocketLeagueDB(db_path="data/rl_stats.db")
+
     for player in players_to_analyze:
         try:
-            analyze_player(player, num_games=10)
+            analyze_player(player, num_games=10, db=db)
         except Exception as e:
             print(f"❌ Error analyzing {player}: {e}")
             continue
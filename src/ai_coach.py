@@ -3,22 +3,81 @@ AI Coach module using Groq API
 Generates personalized coaching tips based on player stats
 """
 
-from groq import Groq
-from typing import Dict, List
-try:
-    import streamlit as st
-    GROQ_API_KEY = st.secrets["GROQ_API_KEY"]
-except:
-    from config import GROQ_API_KEY
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from groq import Groq
+
+SYSTEM_PROMPT = """You are an expert Rocket League coach with years of experience. 
+                        Provide specific, actionable coaching advice based on player statistics. 
+                        Be encouraging but honest. Focus on 3-4 key areas for improvement.
+                        Keep your response concise and well-structured."""
+
+# Completed coaching responses keyed by a hash of model + prompt, shared by
+# every AICoach instance so identical stats never hit the API twice.
+# Kept in least-recently-used order: hits move to the end, evictions take the front.
+_RESPONSE_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_RESPONSE_CACHE_SIZE = 128
+_RESPONSE_CACHE_LOCK = threading.Lock()  # sessions stream on separate threads
+
+
+@functools.cache
+def _get_groq_key() -> str:
+    """Read the Groq API key once, from Streamlit secrets or config.py"""
+    try:
+        import streamlit as st
+        return st.secrets["GROQ_API_KEY"]
+    except:
+        from config import GROQ_API_KEY
+        return GROQ_API_KEY
+
+
+# Quick tip rules: (stat, low threshold, high threshold, low tip, high tip)
+_QUICK_TIP_RULES = (
+    # Goal scoring
+    ("avg_goals", 1.0, 2.0,
+     "🎯 Work on offensive positioning - look for more scoring opportunities",
+     "💪 Excellent goal scoring! Keep applying offensive pressure"),
+    # Playmaking
+    ("avg_assists", 0.8, 1.5,
+     "🤝 Practice passing plays - look for teammates in better positions",
+     "👏 Great playmaking! Your passing creates opportunities"),
+    # Defense
+    ("avg_saves", 1.0, 2.0,
+     "🛡️ Focus on defensive rotation and positioning",
+     "🔒 Solid defense! You're keeping your team in games"),
+    # Shooting accuracy
+    ("avg_shooting_pct", 30, 50,
+     "🎯 Improve shot selection - quality over quantity",
+     "🔥 Excellent shooting accuracy! You're efficient with your shots"),
+    # Win rate
+    ("win_rate", 45, 55,
+     "📈 Focus on consistency - review replays to identify patterns",
+     "🏆 Great win rate! You're climbing steadily"),
+)
 
 
 class AICoach:
     """Generate AI-powered coaching tips using Groq"""
 
-    def __init__(self, api_key: str = GROQ_API_KEY):
-        """Initialize Groq client"""
-        self.client = Groq(api_key=api_key)
+    def __init__(self, api_key: Optional[str] = None):
+        """Store credentials; the Groq client is created on first use"""
+        self.api_key = api_key or _get_groq_key()
         self.model = "llama-3.3-70b-versatile"
+        self._client = None
+
+    @property
+    def client(self) -> "Groq":
+        """Groq client, constructed lazily so AICoach() itself is free"""
+        if self._client is None:
+            # Deferred so importing this module doesn't load the groq SDK
+            from groq import Groq
+            self._client = Groq(api_key=self.api_key)
+        return self._client
 
     def generate_coaching_tips(self, summary_stats: Dict, recent_form: Dict,
                                strengths: Dict, playlist_stats: Dict = None) -> str:
@@ -34,21 +93,44 @@ class AICoach:
         Returns:
             Formatted coaching advice as string
         """
+        return "".join(self.stream_coaching_tips(summary_stats, recent_form, strengths, playlist_stats))
+
+    def stream_coaching_tips(self, summary_stats: Dict, recent_form: Dict,
+                             strengths: Dict, playlist_stats: Dict = None) -> Iterator[str]:
+        """
+        Stream personalized coaching tips as the model generates them
+
+        Args:
+            summary_stats: Overall player statistics
+            recent_form: Recent performance data
+            strengths: Identified strengths and weaknesses
+            playlist_stats: Stats by game mode (optional)
+
+        Yields:
+            Chunks of the coaching advice text
+        """
 
         # Build context prompt
         prompt = self._build_coaching_prompt(summary_stats, recent_form, strengths, playlist_stats)
 
+        cache_key = self._cache_key(prompt)
+        with _RESPONSE_CACHE_LOCK:
+            cached = _RESPONSE_CACHE.get(cache_key)
+            if cached is not None:
+                _RESPONSE_CACHE.move_to_end(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
         try:
             # Call Groq API
-            response = self.client.chat.completions.create(
+            stream = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {
                         "role": "system",
-                        "content": """You are an expert Rocket League coach with years of experience. 
-                        Provide specific, actionable coaching advice based on player statistics. 
-                        Be encouraging but honest. Focus on 3-4 key areas for improvement.
-                        Keep your response concise and well-structured."""
+                        "content": SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -56,13 +138,32 @@ class AICoach:
                     }
                 ],
                 temperature=0.7,
-                max_tokens=800
+                max_tokens=800,
+                stream=True
             )
 
-            return response.choices[0].message.content
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content or ""
+                chunks.append(text)
+                yield text
 
         except Exception as e:
-            return f"Error generating coaching tips: {str(e)}"
+            yield f"Error generating coaching tips: {str(e)}"
+            return
+
+        # Only successful responses are cached; drop the least recently used
+        # entry when full
+        with _RESPONSE_CACHE_LOCK:
+            _RESPONSE_CACHE[cache_key] = "".join(chunks)
+            _RESPONSE_CACHE.move_to_end(cache_key)
+            while len(_RESPONSE_CACHE) > _RESPONSE_CACHE_SIZE:
+                _RESPONSE_CACHE.popitem(last=False)
+
+    def _cache_key(self, prompt: str) -> str:
+        """Stable key for a prompt sent to the current model"""
+        return hashlib.blake2b(f"{self.model}\n{prompt}".encode(), digest_size=16).hexdigest()
 
     def _build_coaching_prompt(self, summary_stats: Dict, recent_form: Dict,
                                strengths: Dict, playlist_stats: Dict = None) -> str:
@@ -122,7 +223,8 @@ Keep it concise, specific, and encouraging."""
 
         return prompt
 
-    def generate_quick_tips(self, summary_stats: Dict) -> List[str]:
+    @staticmethod
+    def generate_quick_tips(summary_stats: Dict) -> List[str]:
         """
         Generate quick bullet-point tips without full analysis
 
@@ -131,52 +233,23 @@ Keep it concise, specific, and encouraging."""
         """
         tips = []
 
-        avg_goals = summary_stats.get('avg_goals', 0)
-        avg_assists = summary_stats.get('avg_assists', 0)
-        avg_saves = summary_stats.get('avg_saves', 0)
-        win_rate = summary_stats.get('win_rate', 0)
-        shooting_pct = summary_stats.get('avg_shooting_pct', 0)
-
-        # Goal scoring
-        if avg_goals < 1.0:
-            tips.append("🎯 Work on offensive positioning - look for more scoring opportunities")
-        elif avg_goals > 2.0:
-            tips.append("💪 Excellent goal scoring! Keep applying offensive pressure")
-
-        # Playmaking
-        if avg_assists < 0.8:
-            tips.append("🤝 Practice passing plays - look for teammates in better positions")
-        elif avg_assists > 1.5:
-            tips.append("👏 Great playmaking! Your passing creates opportunities")
-
-        # Defense
-        if avg_saves < 1.0:
-            tips.append("🛡️ Focus on defensive rotation and positioning")
-        elif avg_saves > 2.0:
-            tips.append("🔒 Solid defense! You're keeping your team in games")
-
-        # Shooting accuracy
-        if shooting_pct < 30:
-            tips.append("🎯 Improve shot selection - quality over quantity")
-        elif shooting_pct > 50:
-            tips.append("🔥 Excellent shooting accuracy! You're efficient with your shots")
-
-        # Win rate
-        if win_rate < 45:
-            tips.append("📈 Focus on consistency - review replays to identify patterns")
-        elif win_rate > 55:
-            tips.append("🏆 Great win rate! You're climbing steadily")
+        for key, low, high, low_tip, high_tip in _QUICK_TIP_RULES:
+            value = summary_stats.get(key, 0)
+            if value < low:
+                tips.append(low_tip)
+            elif value > high:
+                tips.append(high_tip)
 
         return tips[:5]  # Return max 5 tips
 
 
 # Example usage
 if __name__ == "__main__":
-    from database import RocketLeagueDB
-    from analytics import PlayerAnalytics
+    from src.database import RocketLeagueDB
+    from src.analytics import PlayerAnalytics
 
     # Load data
-    db = RocketLeagueDB(db_path="../data/rl_stats.db")
+    db = RocketLeagueDB(db_path="data/rl_stats.db")
     stats_df = db.get_player_stats("Squishy")
 
     # Get analytics
@@ -194,6 +267,6 @@ if __name__ == "__main__":
     print(coaching)
 
     print("\n\n=== QUICK TIPS ===\n")
-    quick_tips = coach.generate_quick_tips(summary)
+    quick_tips = AICoach.generate_quick_tips(summary)
     for tip in quick_tips:
         print(f"  {tip}")
\ No newline at end of file
@@ -2,9 +2,45 @@
 Analytics module for calculating player statistics and metrics
 """
 
+import functools
+import numpy as np
 import pandas as pd
 from typing import Dict, List
 
+# Numeric columns reduced by the summary methods
+STAT_COLUMNS = ("goals", "assists", "saves", "shots", "score", "shooting_percentage")
+# Columns averaged for form windows, in output order
+FORM_COLUMNS = ("goals", "assists", "saves", "score")
+
+# Strength/weakness heuristics (can be improved with rank-based comparisons):
+# a trait is a strength above its high threshold and a weakness below its low one
+TRAIT_COLUMNS = ("goals", "assists", "saves", "shooting_percentage")
+TRAIT_METRICS = ("goals", "assists", "saves", "shooting_pct")
+TRAIT_LABELS = ("Goal scoring", "Playmaking", "Defense", "Shot accuracy")
+TRAIT_HIGH = np.array([1.5, 1.2, 1.5, 40.0])
+TRAIT_LOW = np.array([0.8, 0.6, 0.8, 25.0])
+_TRAIT_INDEX = [STAT_COLUMNS.index(col) for col in TRAIT_COLUMNS]
+
+
+def _group_mean(codes: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """Per-group mean of values, skipping NaN like pandas does"""
+    valid = ~np.isnan(values)
+    sums = np.bincount(codes[valid], weights=values[valid], minlength=n_groups)
+    counts = np.bincount(codes[valid], minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+def _memoized(method):
+    """Cache a PlayerAnalytics method's result per instance and arguments"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        if key not in self._memo:
+            self._memo[key] = method(self, *args, **kwargs)
+        return self._memo[key]
+    return wrapper
+
 
 class PlayerAnalytics:
     """Calculate statistics and metrics from player data"""
@@ -13,11 +49,58 @@ class PlayerAnalytics:
         """
         Initialize with player stats DataFrame
 
+        The frame is treated as read-only: results are memoized per instance
+        and never invalidated, so build a new PlayerAnalytics for new data.
+
         Args:
             stats_df: DataFrame from database.get_player_stats()
         """
         self.df = stats_df
 
+        # Column arrays extracted once so reductions skip pandas indexing
+        if len(stats_df) > 0:
+            # NULL results count as not won, as in the SQL summary
+            self._won = (stats_df["won"] == 1).to_numpy()
+            self._stats = {col: stats_df[col].to_numpy(dtype=float) for col in STAT_COLUMNS}
+        else:
+            self._won = np.empty(0, dtype=bool)
+            self._stats = {col: np.empty(0) for col in STAT_COLUMNS}
+
+        # Columns side by side so several stats are reduced in one call
+        self._stat_block = np.column_stack([self._stats[col] for col in STAT_COLUMNS])
+        self._form_block = np.column_stack([self._stats[col] for col in FORM_COLUMNS])
+        self._chrono = None
+        self._memo = {}
+
+    def _chronological_order(self) -> np.ndarray:
+        """Row positions of self.df sorted oldest first, computed once"""
+        if self._chrono is None:
+            # .values keeps tz-aware dates as datetime64 rather than Timestamp objects
+            self._chrono = np.argsort(self.df["date"].values, kind="stable")
+        return self._chrono
+
+    def _form_stats(self, rows) -> Dict:
+        """
+        Win rate and per-game averages over a subset of games
+
+        Args:
+            rows: Slice or index array selecting games in self.df order
+
+        Returns:
+            Dictionary of win rate and average goals/assists/saves/score
+        """
+        won = self._won[rows]
+        means = np.nanmean(self._form_block[rows], axis=0)
+
+        return {
+            "win_rate": won.sum() / won.size * 100,
+            "avg_goals": means[0],
+            "avg_assists": means[1],
+            "avg_saves": means[2],
+            "avg_score": means[3],
+        }
+
+    @_memoized
     def get_summary_stats(self) -> Dict:
         """
         Calculate overall summary statistics
@@ -28,29 +111,37 @@ class PlayerAnalytics:
         if len(self.df) == 0:
             return {}
 
+        total = self._won.size
+        wins = int(self._won.sum())
+
+        # One pass per reduction over all stat columns, in STAT_COLUMNS order
+        goals, assists, saves, shots, score, shooting_pct = np.nanmean(self._stat_block, axis=0)
+        best_goals, best_assists, best_saves, _, best_score, _ = np.nanmax(self._stat_block, axis=0)
+
         return {
-            "total_games": len(self.df),
-            "wins": int(self.df["won"].sum()),
-            "losses": int((~self.df["won"]).sum()),
-            "win_rate": (self.df["won"].sum() / len(self.df) * 100),
+            "total_games": total,
+            "wins": wins,
+            "losses": total - wins,
+            "win_rate": wins / total * 100,
 
             # Averages
-            "avg_goals": self.df["goals"].mean(),
-            "avg_assists": self.df["assists"].mean(),
-            "avg_saves": self.df["saves"].mean(),
-            "avg_shots": self.df["shots"].mean(),
-            "avg_score": self.df["score"].mean(),
+            "avg_goals": goals,
+            "avg_assists": assists,
+            "avg_saves": saves,
+            "avg_shots": shots,
+            "avg_score": score,
 
             # Shooting
-            "avg_shooting_pct": self.df["shooting_percentage"].mean(),
+            "avg_shooting_pct": shooting_pct,
 
             # Best performances
-            "best_goals": int(self.df["goals"].max()),
-            "best_assists": int(self.df["assists"].max()),
-            "best_saves": int(self.df["saves"].max()),
-            "best_score": int(self.df["score"].max()),
+            "best_goals": int(best_goals),
+            "best_assists": int(best_assists),
+            "best_saves": int(best_saves),
+            "best_score": int(best_score),
         }
 
+    @_memoized
     def get_stats_by_playlist(self) -> Dict[str, Dict]:
         """
         Calculate stats grouped by playlist (game mode)
@@ -61,25 +152,34 @@ class PlayerAnalytics:
         if len(self.df) == 0:
             return {}
 
-        playlists = {}
-
-        for playlist in self.df["playlist"].unique():
-            if pd.isna(playlist):
-                continue
+        # Integer group codes in order of first appearance; missing playlists get -1
+        codes, names = pd.factorize(self.df["playlist"], sort=False)
+        in_group = codes >= 0
+        codes = codes[in_group]
+        n_groups = len(names)
+
+        games = np.bincount(codes, minlength=n_groups)
+        wins = np.bincount(codes, weights=self._won[in_group], minlength=n_groups)
+        means = {
+            col: _group_mean(codes, self._stats[col][in_group], n_groups)
+            for col in FORM_COLUMNS
+        }
 
-            playlist_df = self.df[self.df["playlist"] == playlist]
+        playlists = {}
 
+        for i, playlist in enumerate(names):
             playlists[playlist] = {
-                "games": len(playlist_df),
-                "win_rate": (playlist_df["won"].sum() / len(playlist_df) * 100),
-                "avg_goals": playlist_df["goals"].mean(),
-                "avg_assists": playlist_df["assists"].mean(),
-                "avg_saves": playlist_df["saves"].mean(),
-                "avg_score": playlist_df["score"].mean(),
+                "games": int(games[i]),
+                "win_rate": wins[i] / games[i] * 100,
+                "avg_goals": means["goals"][i],
+                "avg_assists": means["assists"][i],
+                "avg_saves": means["saves"][i],
+                "avg_score": means["score"][i],
             }
 
         return playlists
 
+    @_memoized
     def get_performance_trend(self) -> pd.DataFrame:
         """
         Calculate performance metrics over time
@@ -90,17 +190,20 @@ class PlayerAnalytics:
         if len(self.df) == 0:
             return pd.DataFrame()
 
-        # Sort by date
-        df_sorted = self.df.sort_values("date").copy()
+        # Sort by date (sort_values already returns a new frame)
+        df_sorted = self.df.sort_values("date")
 
-        # Calculate rolling averages (last 5 games)
-        df_sorted["rolling_goals"] = df_sorted["goals"].rolling(window=5, min_periods=1).mean()
-        df_sorted["rolling_assists"] = df_sorted["assists"].rolling(window=5, min_periods=1).mean()
-        df_sorted["rolling_saves"] = df_sorted["saves"].rolling(window=5, min_periods=1).mean()
-        df_sorted["rolling_score"] = df_sorted["score"].rolling(window=5, min_periods=1).mean()
+        # Rolling averages (last 5 games) for all form columns in one pass
+        rolling = (
+            df_sorted[list(FORM_COLUMNS)]
+            .rolling(window=5, min_periods=1)
+            .mean()
+            .add_prefix("rolling_")
+        )
 
-        return df_sorted
+        return pd.concat([df_sorted, rolling], axis=1)
 
+    @_memoized
     def get_recent_form(self, num_games: int = 10) -> Dict:
         """
         Analyze recent performance
@@ -114,19 +217,17 @@ class PlayerAnalytics:
         if len(self.df) == 0:
             return {}
 
-        # Get most recent games
-        recent_df = self.df.head(num_games)
+        # Most recent games come first in the frame
+        recent = slice(0, num_games)
+        won = self._won[recent]
 
         return {
-            "games": len(recent_df),
-            "wins": int(recent_df["won"].sum()),
-            "win_rate": (recent_df["won"].sum() / len(recent_df) * 100),
-            "avg_goals": recent_df["goals"].mean(),
-            "avg_assists": recent_df["assists"].mean(),
-            "avg_saves": recent_df["saves"].mean(),
-            "avg_score": recent_df["score"].mean(),
+            "games": won.size,
+            "wins": int(won.sum()),
+            **self._form_stats(recent),
         }
 
+    @_memoized
     def compare_performance(self, first_n: int = 10, last_n: int = 10) -> Dict:
         """
         Compare early games vs recent games
@@ -138,35 +239,36 @@ class PlayerAnalytics:
         Returns:
             Dictionary comparing stats
         """
-        if len(self.df) < first_n + last_n:
+        if len(self.df) < first_n + last_n or first_n < 1 or last_n < 1:
             return {}
 
-        # Sort by date (oldest first)
-        df_sorted = self.df.sort_values("date", ascending=True)
+        # Row positions by date (oldest first): early games then recent games
+        order = self._chronological_order()
+        rows = np.concatenate([order[:first_n], order[len(order) - last_n:]])
+        starts = [0, first_n]
 
-        early_games = df_sorted.head(first_n)
-        recent_games = df_sorted.tail(last_n)
+        # Both windows reduced in one segmented pass, NaN-skipping like nanmean
+        block = self._form_block[rows]
+        valid = ~np.isnan(block)
+        sums = np.add.reduceat(np.where(valid, block, 0.0), starts, axis=0)
+        counts = np.add.reduceat(valid, starts, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / counts
+        win_rates = np.add.reduceat(self._won[rows], starts) / np.array([first_n, last_n]) * 100
 
-        def calc_stats(df):
-            return {
-                "win_rate": (df["won"].sum() / len(df) * 100),
-                "avg_goals": df["goals"].mean(),
-                "avg_assists": df["assists"].mean(),
-                "avg_saves": df["saves"].mean(),
-                "avg_score": df["score"].mean(),
-            }
+        # Rows: early, recent; columns: win rate then FORM_COLUMNS
+        early_vals, recent_vals = np.column_stack([win_rates, means])
+        change = recent_vals - early_vals
 
-        early_stats = calc_stats(early_games)
-        recent_stats = calc_stats(recent_games)
+        keys = ("win_rate", "avg_goals", "avg_assists", "avg_saves", "avg_score")
+        early_stats = dict(zip(keys, early_vals))
+        recent_stats = dict(zip(keys, recent_vals))
 
         # Calculate improvements
-        improvements = {
-            "win_rate_change": recent_stats["win_rate"] - early_stats["win_rate"],
-            "goals_change": recent_stats["avg_goals"] - early_stats["avg_goals"],
-            "assists_change": recent_stats["avg_assists"] - early_stats["avg_assists"],
-            "saves_change": recent_stats["avg_saves"] - early_stats["avg_saves"],
-            "score_change": recent_stats["avg_score"] - early_stats["avg_score"],
-        }
+        improvements = dict(zip(
+            ("win_rate_change", "goals_change", "assists_change", "saves_change", "score_change"),
+            change
+        ))
 
         return {
             "early": early_stats,
@@ -174,6 +276,7 @@ class PlayerAnalytics:
             "improvement": improvements
         }
 
+    @_memoized
     def get_strengths_and_weaknesses(self) -> Dict:
         """
         Identify player strengths and weaknesses
@@ -185,37 +288,12 @@ class PlayerAnalytics:
         if len(self.df) == 0:
             return {}
 
-        # Calculate percentiles for each stat
-        percentiles = {
-            "goals": self.df["goals"].mean(),
-            "assists": self.df["assists"].mean(),
-            "saves": self.df["saves"].mean(),
-            "shooting_pct": self.df["shooting_percentage"].mean(),
-        }
-
-        strengths = []
-        weaknesses = []
-
-        # Simple heuristics (can be improved with rank-based comparisons)
-        if percentiles["goals"] > 1.5:
-            strengths.append("Goal scoring")
-        elif percentiles["goals"] < 0.8:
-            weaknesses.append("Goal scoring")
-
-        if percentiles["assists"] > 1.2:
-            strengths.append("Playmaking")
-        elif percentiles["assists"] < 0.6:
-            weaknesses.append("Playmaking")
-
-        if percentiles["saves"] > 1.5:
-            strengths.append("Defense")
-        elif percentiles["saves"] < 0.8:
-            weaknesses.append("Defense")
+        # One reduction over the trait columns, then one compare per threshold
+        means = np.nanmean(self._stat_block[:, _TRAIT_INDEX], axis=0)
+        percentiles = dict(zip(TRAIT_METRICS, means))
 
-        if percentiles["shooting_pct"] > 40:
-            strengths.append("Shot accuracy")
-        elif percentiles["shooting_pct"] < 25:
-            weaknesses.append("Shot accuracy")
+        strengths = [label for label, high in zip(TRAIT_LABELS, means > TRAIT_HIGH) if high]
+        weaknesses = [label for label, low in zip(TRAIT_LABELS, means < TRAIT_LOW) if low]
 
         return {
             "strengths": strengths if strengths else ["Consistent all-around player"],
@@ -226,9 +304,9 @@ class PlayerAnalytics:
 
 # Example usage
 if __name__ == "__main__":
-    from database import RocketLeagueDB
+    from src.database import RocketLeagueDB
 
-    db = RocketLeagueDB(db_path="../data/rl_stats.db")
+    db = RocketLeagueDB(db_path="data/rl_stats.db")
     stats_df = db.get_player_stats("Squishy")
 
     analytics = PlayerAnalytics(stats_df)
@@ -3,9 +3,14 @@ Data Collection Module for Rocket League Replays
 Fetches player-specific replay data from Ballchasing API
 """
 
+import json
+import os
 import requests
+import threading
 import time
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Optional, Tuple
 try:
     import streamlit as st
     BALLCHASING_API_KEY = st.secrets["BALLCHASING_API_KEY"]
@@ -13,50 +18,127 @@ except:
     from config import BALLCHASING_API_KEY
 
 
+def _players_by_name(replay_data: Dict) -> Dict[str, Tuple[str, Dict]]:
+    """
+    Index a replay's players by lowercased name
+
+    Args:
+        replay_data: Full replay data from get_replay_details()
+
+    Returns:
+        Dictionary mapping lowercased name to (team_color, player entry);
+        the first occurrence wins, checking blue before orange
+    """
+    players = {}
+    for team_color in ("blue", "orange"):
+        for player in replay_data.get(team_color, {}).get("players", []):
+            players.setdefault(player.get("name", "").lower(), (team_color, player))
+    return players
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` requests per second"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
 class BallchasingAPI:
     """Wrapper for Ballchasing API"""
 
     BASE_URL = "https://ballchasing.com/api"
+    RATE_LIMIT = 2  # requests per second (free tier)
+    PAGE_SIZE = 200  # max replays per search request
+    MAX_WORKERS = 8  # concurrent replay downloads
+    CACHE_DIR = "data/replays"  # processed replays are immutable, so kept on disk
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_dir: Optional[str] = CACHE_DIR):
+        """
+        Args:
+            api_key: Ballchasing API key
+            cache_dir: Directory for cached replay JSON, or None to disable
+        """
         self.api_key = api_key
         self.headers = {"Authorization": api_key}
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        # Shared session so TCP/TLS connections are reused across requests
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=self.MAX_WORKERS, pool_maxsize=self.MAX_WORKERS)
+        self.session.mount("https://", adapter)
+
+        self.limiter = RateLimiter(self.RATE_LIMIT)
 
     def search_replays(self, player_name: str, count: int = 30) -> List[Dict]:
         """
         Search for replays by player name
 
+        Results come 200 per page at most; further pages are followed through
+        the response's "next" link until `count` replays are collected.
+
         Args:
             player_name: Name of the player to search for
-            count: Number of replays to fetch (max 200)
+            count: Number of replays to fetch
 
         Returns:
-            List of replay metadata dictionaries
+            List of replay metadata dictionaries, most recent first
         """
         params = {
             "player-name": player_name,
-            "count": min(count, 200),  # API max is 200
+            "count": min(count, self.PAGE_SIZE),  # API max is 200 per page
             "sort-by": "replay-date",
             "sort-dir": "desc"  # Most recent first
         }
 
+        # Keyed by id so a replay repeated across pages is only kept once
+        replays = {}
+        url = f"{self.BASE_URL}/replays"
+
         try:
-            response = requests.get(
-                f"{self.BASE_URL}/replays",
-                headers=self.headers,
-                params=params
-            )
-            response.raise_for_status()
+            # "next" is a cursor into the sorted listing, so pages are fetched in order
+            while url and len(replays) < count:
+                self.limiter.acquire()
+                response = self.session.get(url, params=params)
+                response.raise_for_status()
 
-            data = response.json()
-            replays = data.get("list", [])
+                data = response.json()
+                for replay in data.get("list", []):
+                    replays.setdefault(replay.get("id"), replay)
 
-            print(f"Found {len(replays)} replays for player: {player_name}")
-            return replays
+                # The next link already carries the query string
+                url, params = data.get("next"), None
 
         except requests.exceptions.RequestException as e:
             print(f"Error fetching replays: {e}")
-            return []
+            if not replays:
+                return []
+
+        replays = list(replays.values())[:count]
+        print(f"Found {len(replays)} replays for player: {player_name}")
+        return replays
 
     def get_replay_details(self, replay_id: str) -> Optional[Dict]:
         """
@@ -68,19 +150,59 @@ class BallchasingAPI:
         Returns:
             Detailed replay data including all player stats
         """
+        # Cached replays skip both the request and the rate limiter
+        cached = self._read_cached_replay(replay_id)
+        if cached is not None:
+            return cached
+
         try:
-            response = requests.get(
-                f"{self.BASE_URL}/replays/{replay_id}",
-                headers=self.headers
-            )
+            self.limiter.acquire()
+            response = self.session.get(f"{self.BASE_URL}/replays/{replay_id}")
             response.raise_for_status()
 
-            return response.json()
+            data = response.json()
 
         except requests.exceptions.RequestException as e:
             print(f"Error fetching replay {replay_id}: {e}")
             return None
 
+        # Replays still processing (or failed) may change, so only finished
+        # ones are cached
+        if data.get("status") == "ok":
+            self._write_cached_replay(replay_id, data)
+        return data
+
+    def _cache_path(self, replay_id: str) -> Optional[str]:
+        """File holding a replay's cached JSON, or None if caching is off"""
+        if not self.cache_dir or not replay_id:
+            return None
+        return os.path.join(self.cache_dir, f"{os.path.basename(str(replay_id))}.json")
+
+    def _read_cached_replay(self, replay_id: str) -> Optional[Dict]:
+        """Load replay details saved by an earlier fetch"""
+        path = self._cache_path(replay_id)
+        if path is None:
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Missing or unreadable entries are simply refetched
+            return None
+
+    def _write_cached_replay(self, replay_id: str, data: Dict):
+        """Save replay details; written to a temp file first so readers never see partial JSON"""
+        path = self._cache_path(replay_id)
+        if path is None:
+            return
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Could not cache replay {replay_id}: {e}")
+
     def get_player_stats_from_replay(self, replay_data: Dict, player_name: str) -> Optional[Dict]:
         """
         Extract stats for a specific player from replay data
@@ -92,67 +214,102 @@ class BallchasingAPI:
         Returns:
             Dictionary of player stats for this game
         """
-        # Check both teams
-        for team_color in ["blue", "orange"]:
-            team_data = replay_data.get(team_color, {})
-            players = team_data.get("players", [])
-
-            for player in players:
-                # Case-insensitive name matching
-                if player.get("name", "").lower() == player_name.lower():
-                    # Extract core stats
-                    stats = player.get("stats", {})
-                    core = stats.get("core", {})
-                    boost = stats.get("boost", {})
-                    movement = stats.get("movement", {})
-                    positioning = stats.get("positioning", {})
-
-                    # Determine if player won
-                    blue_goals = replay_data.get("blue", {}).get("stats", {}).get("core", {}).get("goals", 0)
-                    orange_goals = replay_data.get("orange", {}).get("stats", {}).get("core", {}).get("goals", 0)
-
-                    if team_color == "blue":
-                        won = blue_goals > orange_goals
-                    else:
-                        won = orange_goals > blue_goals
-
-                    return {
-                        # Game metadata
-                        "replay_id": replay_data.get("id"),
-                        "date": replay_data.get("date"),
-                        "duration": replay_data.get("duration"),
-                        "playlist": replay_data.get("playlist_name"),
-
-                        # Player info
-                        "player_name": player.get("name"),
-                        "team": team_color,
-                        "won": won,
-
-                        # Core stats
-                        "goals": core.get("goals", 0),
-                        "assists": core.get("assists", 0),
-                        "saves": core.get("saves", 0),
-                        "shots": core.get("shots", 0),
-                        "score": core.get("score", 0),
-                        "shooting_percentage": core.get("shooting_percentage", 0),
-
-                        # Boost stats
-                        "boost_collected": boost.get("bcpm", 0),  # boost collected per minute
-                        "boost_stolen": boost.get("stolen", 0),
-                        "boost_used": boost.get("used_while_supersonic", 0),
-
-                        # Movement
-                        "avg_speed": movement.get("avg_speed", 0),
-                        "time_supersonic": movement.get("time_supersonic_speed", 0),
-
-                        # Positioning
-                        "time_defensive_third": positioning.get("time_defensive_third", 0),
-                        "time_neutral_third": positioning.get("time_neutral_third", 0),
-                        "time_offensive_third": positioning.get("time_offensive_third", 0),
-                    }
-
-        # Player not found in this replay
-        return None
+        match = _players_by_name(replay_data).get(player_name.lower())
+        if match is None:
+            # Player not found in this replay
+            return None
+
+        return self._extract_player_stats(replay_data, *match)
+
+    def _extract_player_stats(self, replay_data: Dict, team_color: str, player: Dict) -> Dict:
+        """
+        Build the stats dictionary for one player already located in a replay
+
+        Args:
+            replay_data: Full replay data from get_replay_details()
+            team_color: "blue" or "orange"
+            player: The player's entry from replay_data[team_color]["players"]
+
+        Returns:
+            Dictionary of player stats for this game
+        """
+        # Extract core stats
+        stats = player.get("stats", {})
+        core = stats.get("core", {})
+        boost = stats.get("boost", {})
+        movement = stats.get("movement", {})
+        positioning = stats.get("positioning", {})
+
+        # Determine if player won
+        blue_goals = replay_data.get("blue", {}).get("stats", {}).get("core", {}).get("goals", 0)
+        orange_goals = replay_data.get("orange", {}).get("stats", {}).get("core", {}).get("goals", 0)
+
+        if team_color == "blue":
+            won = blue_goals > orange_goals
+        else:
+            won = orange_goals > blue_goals
+
+        return {
+            # Game metadata
+            "replay_id": replay_data.get("id"),
+            "date": replay_data.get("date"),
+            "duration": replay_data.get("duration"),
+            "playlist": replay_data.get("playlist_name"),
+
+            # Player info
+            "player_name": player.get("name"),
+            "team": team_color,
+            "won": won,
+
+            # Core stats
+            "goals": core.get("goals", 0),
+            "assists": core.get("assists", 0),
+            "saves": core.get("saves", 0),
+            "shots": core.get("shots", 0),
+            "score": core.get("score", 0),
+            "shooting_percentage": core.get("shooting_percentage", 0),
+
+            # Boost stats
+            "boost_collected": boost.get("bcpm", 0),  # boost collected per minute
+            "boost_stolen": boost.get("stolen", 0),
+            "boost_used": boost.get("used_while_supersonic", 0),
+
+            # Movement
+            "avg_speed": movement.get("avg_speed", 0),
+            "time_supersonic": movement.get("time_supersonic_speed", 0),
+
+            # Positioning
+            "time_defensive_third": positioning.get("time_defensive_third", 0),
+            "time_neutral_third": positioning.get("time_neutral_third", 0),
+            "time_offensive_third": positioning.get("time_offensive_third", 0),
+        }
+
+    def _get_player_game(self, replay_id: str, player_name: str) -> Optional[Dict]:
+        """
+        Fetch one replay and extract a player's stats from it
+
+        Args:
+            replay_id: Unique replay identifier
+            player_name: Name of player to extract stats for
+
+        Returns:
+            Dictionary of player stats, or None if unavailable
+        """
+        # Get detailed replay data
+        detailed_replay = self.get_replay_details(replay_id)
+
+        if not detailed_replay:
+            return None
+
+        # Check if player with exact name is in this replay
+        match = _players_by_name(detailed_replay).get(player_name.lower())
+
+        if match is None:
+            print(f"  ⏭️  Skipping - exact player name '{player_name}' not in replay")
+            return None
+
+        # Extract player's stats from this game
+        return self._extract_player_stats(detailed_replay, *match)
 
     def get_player_match_history(self, player_name: str, num_games: int = 30) -> List[Dict]:
         """
@@ -175,46 +332,23 @@ class BallchasingAPI:
             print(f"❌ No replays found for {player_name}")
             return []
 
-        # Step 2: Get detailed stats for each replay
-        match_history = []
-
-        for i, replay in enumerate(replays, 1):
-            replay_id = replay.get("id")
-
-            print(f"Processing game {i}/{len(replays)}: {replay_id}")
+        # Step 2: Get detailed stats for each replay, several at a time.
+        # The rate limiter keeps the combined request rate within the API quota.
+        replay_ids = [replay.get("id") for replay in replays]
 
-            # Get detailed replay data
-            detailed_replay = self.get_replay_details(replay_id)
+        def process(job):
+            i, replay_id = job
+            print(f"Processing game {i}/{len(replay_ids)}: {replay_id}")
+            return self._get_player_game(replay_id, player_name)
 
-            if not detailed_replay:
-                continue
-
-            # Check if player with exact name is in this replay
-            player_found = False
-            for team_color in ["blue", "orange"]:
-                team_data = detailed_replay.get(team_color, {})
-                players = team_data.get("players", [])
-                for player in players:
-                    if player.get("name", "").lower() == player_name.lower():
-                        player_found = True
-                        break
-                if player_found:
-                    break
-
-            if not player_found:
-                print(f"  ⏭️  Skipping - exact player name '{player_name}' not in replay")
-                continue
-
-            # Extract player's stats from this game
-            player_stats = self.get_player_stats_from_replay(detailed_replay, player_name)
-
-            if player_stats:
-                match_history.append(player_stats)
-            else:
-                print(f"  ⚠️  Player {player_name} not found in replay {replay_id}")
-
-            # Rate limiting - be nice to the API
-            time.sleep(0.5)  # Wait 500ms between requests
+        # Games are collected as they finish; the database orders them by date
+        match_history = []
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            futures = [executor.submit(process, job) for job in enumerate(replay_ids, 1)]
+            for future in as_completed(futures):
+                stats = future.result()
+                if stats:
+                    match_history.append(stats)
 
         print(f"\n✅ Successfully retrieved {len(match_history)} games")
         return match_history
@@ -236,14 +370,13 @@ if __name__ == "__main__":
         print(f"\n📊 Stats Summary for {player_name}:")
         print(f"Games analyzed: {len(match_history)}")
 
-        # Calculate averages
-        avg_goals = sum(g["goals"] for g in match_history) / len(match_history)
-        avg_assists = sum(g["assists"] for g in match_history) / len(match_history)
-        avg_saves = sum(g["saves"] for g in match_history) / len(match_history)
-        wins = sum(1 for g in match_history if g["won"])
-        win_rate = (wins / len(match_history)) * 100
-
-        print(f"Average Goals: {avg_goals:.2f}")
-        print(f"Average Assists: {avg_assists:.2f}")
-        print(f"Average Saves: {avg_saves:.2f}")
-        print(f"Win Rate: {win_rate:.1f}%")
\ No newline at end of file
+        # Calculate averages with the same reducer the app uses
+        import pandas as pd
+        from src.analytics import PlayerAnalytics
+
+        summary = PlayerAnalytics(pd.DataFrame(match_history)).get_summary_stats()
+
+        print(f"Average Goals: {summary['avg_goals']:.2f}")
+        print(f"Average Assists: {summary['avg_assists']:.2f}")
+        print(f"Average Saves: {summary['avg_saves']:.2f}")
+        print(f"Win Rate: {summary['win_rate']:.1f}%")
\ No newline at end of file
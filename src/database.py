@@ -4,15 +4,142 @@ Uses SQLite for simplicity
 """
 
 import sqlite3
+import threading
 import pandas as pd
-from typing import List, Dict
-from datetime import datetime
+from typing import List, Dict, Optional
+from datetime import datetime, timezone
+from itertools import islice
+
+
+def _to_timestamp(value) -> Optional[int]:
+    """
+    Convert a replay date to unix seconds for storage
+
+    Args:
+        value: ISO 8601 string (as returned by Ballchasing), datetime, or
+            number already in unix seconds
+
+    Returns:
+        Whole seconds since the epoch, or None if the date is missing or
+        unparseable. Dates without an offset are taken as UTC.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
 
 
 class RocketLeagueDB:
     """SQLite database for storing player match history"""
 
-    def __init__(self, db_path: str = "../data/rl_stats.db"):
+    PLAYER_STATS_QUERY = """
+        SELECT m.*
+        FROM match_history m
+        JOIN players p ON m.player_id = p.player_id
+        WHERE p.player_name = ?
+        ORDER BY m.date DESC
+    """
+
+    CREATE_MATCH_HISTORY_SQL = """
+        CREATE TABLE IF NOT EXISTS match_history (
+            match_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_id INTEGER,
+            replay_id TEXT UNIQUE,
+            date INTEGER,  -- unix seconds, UTC
+            duration INTEGER,
+            playlist TEXT,
+            team TEXT,
+            won BOOLEAN,
+            goals INTEGER,
+            assists INTEGER,
+            saves INTEGER,
+            shots INTEGER,
+            score INTEGER,
+            shooting_percentage REAL,
+            boost_collected REAL,
+            boost_stolen INTEGER,
+            boost_used INTEGER,
+            avg_speed REAL,
+            time_supersonic REAL,
+            time_defensive_third REAL,
+            time_neutral_third REAL,
+            time_offensive_third REAL,
+            FOREIGN KEY (player_id) REFERENCES players (player_id)
+        )
+    """
+
+    # Match dict keys stored per game, in match_history column order
+    MATCH_COLUMNS = (
+        "replay_id", "date", "duration", "playlist",
+        "team", "won", "goals", "assists", "saves", "shots", "score",
+        "shooting_percentage", "boost_collected", "boost_stolen",
+        "boost_used", "avg_speed", "time_supersonic",
+        "time_defensive_third", "time_neutral_third", "time_offensive_third",
+    )
+
+    INSERT_MATCH_SQL = f"""
+        INSERT INTO match_history (player_id, {", ".join(MATCH_COLUMNS)})
+        VALUES ({", ".join("?" * (len(MATCH_COLUMNS) + 1))})
+        ON CONFLICT (replay_id) DO NOTHING
+    """
+    INSERT_BATCH_SIZE = 500
+
+    # Compact dtypes applied to loaded stats; integer casts only happen for
+    # columns without NULLs so no value is lost
+    CATEGORY_COLUMNS = ("playlist", "team")
+    INT32_COLUMNS = (
+        "duration", "goals", "assists", "saves", "shots", "score",
+        "boost_stolen", "boost_used",
+    )
+
+    # Aggregates materialized into player_summary, in PlayerAnalytics key order
+    SUMMARY_FIELDS = (
+        "total_games", "wins", "losses", "win_rate",
+        "avg_goals", "avg_assists", "avg_saves", "avg_shots", "avg_score",
+        "avg_shooting_pct",
+        "best_goals", "best_assists", "best_saves", "best_score",
+    )
+
+    REFRESH_SUMMARY_SQL = """
+        INSERT OR REPLACE INTO player_summary (
+            player_id, total_games, wins, losses, win_rate,
+            avg_goals, avg_assists, avg_saves, avg_shots, avg_score,
+            avg_shooting_pct,
+            best_goals, best_assists, best_saves, best_score
+        )
+        SELECT
+            player_id, COUNT(*), SUM(won), COUNT(*) - SUM(won), SUM(won) * 100.0 / COUNT(*),
+            AVG(goals), AVG(assists), AVG(saves), AVG(shots), AVG(score),
+            AVG(shooting_percentage),
+            MAX(goals), MAX(assists), MAX(saves), MAX(score)
+        FROM match_history
+        WHERE player_id = ?
+        GROUP BY player_id
+    """
+
+    def __init__(self, db_path: str = "data/rl_stats.db",
+                 conn: Optional[sqlite3.Connection] = None):
+            """
+            Initialize database and create tables
+
+            One connection is kept open for the lifetime of the instance (and
+            reopened on next use after close()). It may be shared between
+            threads; public methods hold the instance lock while they use it,
+            so transactions from different threads never interleave.
+
+            Args:
+                db_path: Path to the SQLite database file
+                conn: Existing connection to reuse for every query. When given,
+                    the caller owns it and close() leaves it open.
+            """
             import os
 
             # Create data directory if it doesn't exist
@@ -21,66 +148,133 @@ class RocketLeagueDB:
                 os.makedirs(db_dir)
 
             self.db_path = db_path
-            self.conn = None
+            self._owns_conn = conn is None
+            self._conn = conn  # opened by _connection() when not given
+            self._known = None  # player names, loaded on first player_exists()
+            self._lock = threading.RLock()  # serializes use of self._conn
+            if conn is not None:
+                self._configure(conn)
             self.create_tables()
 
-    def connect(self):
-        """Create database connection"""
-        self.conn = sqlite3.connect(self.db_path)
-        return self.conn
+    @staticmethod
+    def _configure(conn: sqlite3.Connection):
+        """Apply connection pragmas"""
+        conn.execute("PRAGMA journal_mode=WAL")  # persistent for the file
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")  # ~64MB page cache
+        conn.execute("PRAGMA foreign_keys=ON")
+
+    def _connection(self) -> sqlite3.Connection:
+        """The shared connection, opened on first use (caller holds self._lock)"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._configure(self._conn)
+        return self._conn
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Open a separate connection to the database file
+
+        The shared connection stays private to this instance; the returned
+        one belongs to the caller, who closes it.
+        """
+        conn = sqlite3.connect(self.db_path)
+        self._configure(conn)
+        return conn
 
     def close(self):
-        """Close database connection"""
-        if self.conn:
-            self.conn.close()
+        """Close database connection (shared connections stay open)"""
+        with self._lock:
+            if self._owns_conn and self._conn:
+                self._conn.close()
+                self._conn = None
 
     def create_tables(self):
         """Create database tables if they don't exist"""
-        conn = self.connect()
-        cursor = conn.cursor()
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.cursor()
+
+            # Players table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS players (
+                    player_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    player_name TEXT UNIQUE NOT NULL,
+                    last_updated TIMESTAMP,
+                    total_games INTEGER DEFAULT 0
+                )
+            """)
+
+            # Match history table
+            cursor.execute(self.CREATE_MATCH_HISTORY_SQL)
+            self._migrate_text_dates(cursor)
+
+            # Index for per-player lookups ordered by date
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_match_player_date
+                ON match_history (player_id, date DESC)
+            """)
+
+            # Per-player aggregates, refreshed whenever match history is added
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS player_summary (
+                    player_id INTEGER PRIMARY KEY,
+                    total_games INTEGER,
+                    wins INTEGER,
+                    losses INTEGER,
+                    win_rate REAL,
+                    avg_goals REAL,
+                    avg_assists REAL,
+                    avg_saves REAL,
+                    avg_shots REAL,
+                    avg_score REAL,
+                    avg_shooting_pct REAL,
+                    best_goals INTEGER,
+                    best_assists INTEGER,
+                    best_saves INTEGER,
+                    best_score INTEGER,
+                    FOREIGN KEY (player_id) REFERENCES players (player_id)
+                )
+            """)
+
+            conn.commit()
+            print("✅ Database tables created")
+
+    def _migrate_text_dates(self, cursor: sqlite3.Cursor):
+        """
+        Rebuild a match_history table created with TEXT dates
 
-        # Players table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS players (
-                player_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                player_name TEXT UNIQUE NOT NULL,
-                last_updated TIMESTAMP,
-                total_games INTEGER DEFAULT 0
-            )
-        """)
-
-        # Match history table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS match_history (
-                match_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                player_id INTEGER,
-                replay_id TEXT UNIQUE,
-                date TEXT,
-                duration INTEGER,
-                playlist TEXT,
-                team TEXT,
-                won BOOLEAN,
-                goals INTEGER,
-                assists INTEGER,
-                saves INTEGER,
-                shots INTEGER,
-                score INTEGER,
-                shooting_percentage REAL,
-                boost_collected REAL,
-                boost_stolen INTEGER,
-                boost_used INTEGER,
-                avg_speed REAL,
-                time_supersonic REAL,
-                time_defensive_third REAL,
-                time_neutral_third REAL,
-                time_offensive_third REAL,
-                FOREIGN KEY (player_id) REFERENCES players (player_id)
-            )
-        """)
-
-        conn.commit()
-        conn.close()
-        print("✅ Database tables created")
+        Older databases stored ISO date strings; their rows are copied into
+        the INTEGER-dated schema once, converting with SQLite's strftime.
+        Must run before the date index is created, since dropping the old
+        table drops its index.
+        """
+        columns = {row[1]: row[2] for row in cursor.execute("PRAGMA table_info(match_history)")}
+        if columns.get("date", "").upper() != "TEXT":
+            return
+
+        names = ["match_id", "player_id", *self.MATCH_COLUMNS]
+        selected = [
+            "CAST(strftime('%s', date) AS INTEGER)" if name == "date" else name
+            for name in names
+        ]
+
+        cursor.execute("BEGIN")
+        try:
+            cursor.execute("ALTER TABLE match_history RENAME TO match_history_text_dates")
+            cursor.execute(self.CREATE_MATCH_HISTORY_SQL)
+            cursor.execute(f"""
+                INSERT INTO match_history ({", ".join(names)})
+                SELECT {", ".join(selected)} FROM match_history_text_dates
+            """)
+            cursor.execute("DROP TABLE match_history_text_dates")
+            cursor.execute("COMMIT")
+        except sqlite3.Error:
+            cursor.execute("ROLLBACK")
+            raise
+
+        print("✅ Migrated match dates to unix timestamps")
 
     def add_player(self, player_name: str) -> int:
         """
@@ -89,8 +283,18 @@ class RocketLeagueDB:
         Returns:
             player_id
         """
-        conn = self.connect()
-        cursor = conn.cursor()
+        with self._lock:
+            with self._connection():
+                player_id = self._get_or_create_player(player_name)
+
+            if self._known is not None:
+                self._known.add(player_name)
+
+            return player_id
+
+    def _get_or_create_player(self, player_name: str) -> int:
+        """Insert a player if missing and return its id (no commit, caller holds the lock)"""
+        cursor = self._connection().cursor()
 
         cursor.execute("""
             INSERT OR IGNORE INTO players (player_name, last_updated)
@@ -99,12 +303,7 @@ class RocketLeagueDB:
 
         # Get player_id
         cursor.execute("SELECT player_id FROM players WHERE player_name = ?", (player_name,))
-        player_id = cursor.fetchone()[0]
-
-        conn.commit()
-        conn.close()
-
-        return player_id
+        return cursor.fetchone()[0]
 
     def add_match_history(self, player_name: str, match_data: List[Dict]):
         """
@@ -114,64 +313,48 @@ class RocketLeagueDB:
             player_name: Name of the player
             match_data: List of match stat dictionaries
         """
-        conn = self.connect()
-        cursor = conn.cursor()
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.cursor()
+
+            # Everything below commits as one transaction, or rolls back on error
+            with conn:
+                # Get or create player
+                player_id = self._get_or_create_player(player_name)
+
+                # Insert all matches in batches so a large history doesn't build
+                # one huge parameter list
+                rows = (self._match_row(player_id, match) for match in match_data)
+
+                games_added = 0
+                while batch := list(islice(rows, self.INSERT_BATCH_SIZE)):
+                    # Replays already stored are skipped by ON CONFLICT; rowcount
+                    # only counts rows actually inserted
+                    cursor.executemany(self.INSERT_MATCH_SQL, batch)
+                    games_added += cursor.rowcount
+
+                # Update player record; the inserted count keeps total_games
+                # current without recounting the player's matches. The instance
+                # lock is held, so rowcount only reflects this call's inserts.
+                cursor.execute("""
+                    UPDATE players 
+                    SET last_updated = ?, 
+                        total_games = total_games + ?
+                    WHERE player_id = ?
+                """, (datetime.now(), games_added, player_id))
 
-        # Get or create player
-        player_id = self.add_player(player_name)
+                # Rebuild the materialized summary in the same transaction
+                cursor.execute(self.REFRESH_SUMMARY_SQL, (player_id,))
 
-        # Insert each match
-        games_added = 0
-        for match in match_data:
-            try:
-                cursor.execute("""
-                    INSERT OR IGNORE INTO match_history (
-                        player_id, replay_id, date, duration, playlist,
-                        team, won, goals, assists, saves, shots, score,
-                        shooting_percentage, boost_collected, boost_stolen,
-                        boost_used, avg_speed, time_supersonic,
-                        time_defensive_third, time_neutral_third, time_offensive_third
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    player_id,
-                    match.get("replay_id"),
-                    match.get("date"),
-                    match.get("duration"),
-                    match.get("playlist"),
-                    match.get("team"),
-                    match.get("won"),
-                    match.get("goals"),
-                    match.get("assists"),
-                    match.get("saves"),
-                    match.get("shots"),
-                    match.get("score"),
-                    match.get("shooting_percentage"),
-                    match.get("boost_collected"),
-                    match.get("boost_stolen"),
-                    match.get("boost_used"),
-                    match.get("avg_speed"),
-                    match.get("time_supersonic"),
-                    match.get("time_defensive_third"),
-                    match.get("time_neutral_third"),
-                    match.get("time_offensive_third")
-                ))
-                games_added += 1
-            except sqlite3.IntegrityError:
-                # Replay already exists, skip
-                pass
-
-        # Update player record
-        cursor.execute("""
-            UPDATE players 
-            SET last_updated = ?, 
-                total_games = (SELECT COUNT(*) FROM match_history WHERE player_id = ?)
-            WHERE player_id = ?
-        """, (datetime.now(), player_id, player_id))
+            if self._known is not None:
+                self._known.add(player_name)
 
-        conn.commit()
-        conn.close()
+            print(f"✅ Added {games_added} new games to database for {player_name}")
 
-        print(f"✅ Added {games_added} new games to database for {player_name}")
+    def _match_row(self, player_id: int, match: Dict) -> tuple:
+        """INSERT_MATCH_SQL parameters for one match, with the date as unix seconds"""
+        values = dict(match, date=_to_timestamp(match.get("date")))
+        return (player_id, *map(values.get, self.MATCH_COLUMNS))
 
     def get_player_stats(self, player_name: str) -> pd.DataFrame:
         """
@@ -181,33 +364,118 @@ class RocketLeagueDB:
             player_name: Name of the player
 
         Returns:
-            pandas DataFrame with all match data
+            pandas DataFrame with all match data, most recent first
+        """
+        with self._lock:
+            df = pd.read_sql_query(self.PLAYER_STATS_QUERY, self._connection(), params=(player_name,))
+
+        # Dates are stored as unix seconds; expose them as UTC timestamps
+        df["date"] = pd.to_datetime(df["date"], unit="s", utc=True)
+
+        return self._compact_dtypes(df)
+
+    def _compact_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Cast repeated strings to category and NULL-free ints/flags to narrow types"""
+        dtypes = {col: "category" for col in self.CATEGORY_COLUMNS if col in df}
+        for col in self.INT32_COLUMNS:
+            if col in df and df[col].notna().all():
+                dtypes[col] = "int32"
+        if "won" in df and df["won"].notna().all():
+            dtypes["won"] = "bool"
+        return df.astype(dtypes)
+
+    def get_summary_stats(self, player_name: str) -> Dict:
+        """
+        Read a player's precomputed summary stats from player_summary
+
+        Summaries are rebuilt by add_match_history; players stored before the
+        summary table existed are backfilled on first read.
+
+        Args:
+            player_name: Name of the player
+
+        Returns:
+            Dictionary of summary stats (same keys as
+            PlayerAnalytics.get_summary_stats), empty if no games are stored
+        """
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.cursor()
+
+            query = f"""
+                SELECT {", ".join("s." + field for field in self.SUMMARY_FIELDS)}
+                FROM player_summary s
+                JOIN players p ON s.player_id = p.player_id
+                WHERE p.player_name = ?
+            """
+            cursor.execute(query, (player_name,))
+            row = cursor.fetchone()
+
+            if row is None:
+                cursor.execute("SELECT player_id FROM players WHERE player_name = ?", (player_name,))
+                player = cursor.fetchone()
+                if player is not None:
+                    with conn:
+                        cursor.execute(self.REFRESH_SUMMARY_SQL, (player[0],))
+                    cursor.execute(query, (player_name,))
+                    row = cursor.fetchone()
+
+            if row is None:
+                return {}
+            return dict(zip(self.SUMMARY_FIELDS, row))
+
+    def fetch_or_none(self, player_name: str) -> Optional[pd.DataFrame]:
+        """
+        Retrieve a player's stats in a single query
+
+        Args:
+            player_name: Name of the player
+
+        Returns:
+            pandas DataFrame with all match data, or None if no games are stored
         """
-        conn = self.connect()
+        df = self.get_player_stats(player_name)
+        return df if len(df) > 0 else None
 
-        query = """
-            SELECT m.* 
-            FROM match_history m
-            JOIN players p ON m.player_id = p.player_id
-            WHERE p.player_name = ?
-            ORDER BY m.date DESC
+    def known_players(self) -> frozenset:
         """
+        Names of all stored players, loaded with one query and kept in memory
+
+        The set is updated by add_player, so it stays current for writes made
+        through this instance.
 
-        df = pd.read_sql_query(query, conn, params=(player_name,))
-        conn.close()
+        Returns:
+            Frozen snapshot of the player names
+        """
+        with self._lock:
+            return frozenset(self._known_names())
 
-        return df
+    def _known_names(self) -> set:
+        """The in-memory name set itself, loaded on first use (caller holds the lock)"""
+        if self._known is None:
+            cursor = self._connection().execute("SELECT player_name FROM players")
+            self._known = {row[0] for row in cursor.fetchall()}
+        return self._known
 
     def player_exists(self, player_name: str) -> bool:
-        """Check if player data exists in database"""
-        conn = self.connect()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT COUNT(*) FROM players WHERE player_name = ?", (player_name,))
-        exists = cursor.fetchone()[0] > 0
+        """
+        Check if player data exists in database
 
-        conn.close()
-        return exists
+        Names in the in-memory set answer immediately; anything else is
+        checked with a LIMIT 1 probe on the players name index, so players
+        added by another process are still found.
+        """
+        with self._lock:
+            known = self._known_names()
+            if player_name in known:
+                return True
+
+            row = self._connection().execute(
+                "SELECT 1 FROM players WHERE player_name = ? LIMIT 1", (player_name,)
+            ).fetchone()
+            if row is not None:
+                known.add(player_name)
+            return row is not None
 
 
 # Example usage
@@ -2,16 +2,149 @@
 Visualization module for creating charts and graphs
 """
 
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
+import hashlib
+import json
+import numpy as np
 import pandas as pd
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+
+def _lttb_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling of an evenly spaced series
+
+    Args:
+        y: Series values, indexed by position
+        n_out: Number of points to keep (first and last are always kept)
+
+    Returns:
+        Sorted array of the indices to keep
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Bucket edges for the interior points; first and last points are fixed
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+
+        # Average of the next bucket is the third triangle vertex
+        next_x = (end + next_end - 1) / 2
+        next_y = y[end:next_end].mean()
+
+        xs = np.arange(start, end)
+        areas = np.abs((prev - next_x) * (y[start:end] - y[prev]) - (prev - xs) * (next_y - y[prev]))
+        prev = start + int(areas.argmax())
+        keep[i + 1] = prev
+
+    return keep
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing mean over the last `window` rows, in one cumulative-sum pass
+
+    Matches pandas rolling(window, min_periods=1).mean(): NaN values are
+    skipped and a window with no valid values gives NaN. A 2-D block is
+    reduced column by column in the same pass.
+
+    Args:
+        values: Per-game values in chronological order, one row per game
+            and optionally one column per stat
+        window: Number of games per window
+
+    Returns:
+        Array of rolling means, same shape as values
+    """
+    valid = ~np.isnan(values)
+    pad = np.zeros((1,) + values.shape[1:])
+    sums = np.concatenate((pad, np.cumsum(np.where(valid, values, 0.0), axis=0)))
+    counts = np.concatenate((pad, np.cumsum(valid, axis=0)))
+
+    # Window i covers values[start:i + 1]
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (sums[end] - sums[start]) / (counts[end] - counts[start])
+
+
+# Charts whose trace and layout structure has passed plotly's schema check
+_CHECKED_CHARTS = set()
+
+
+def _figure(data: Optional[List[Dict]] = None, layout: Optional[Dict] = None,
+            chart: Optional[str] = None) -> "go.Figure":
+    """
+    Build a Figure from plain trace and layout dicts, validating once per chart
+
+    Property validation dominates figure construction time, and each chart
+    passes the same properties on every build with only the values changing.
+    So the first build of each named chart goes through plotly's validators
+    (raising ValueError on a bad property) and later builds skip them.
+    A template given by name is looked up here, since only the validators
+    would otherwise resolve it.
+
+    Args:
+        data: Trace dicts, each with a "type"
+        layout: Layout dict in canonical nested form
+        chart: Name of the chart being built; None skips the check
+    """
+    # Deferred so importing this module doesn't load plotly
+    import plotly.graph_objects as go
+    import plotly.io as pio
+
+    layout = dict(layout or {})
+    if isinstance(layout.get("template"), str):
+        layout["template"] = pio.templates[layout["template"]]
+    spec = {"data": data or [], "layout": layout}
+
+    if chart is not None and chart not in _CHECKED_CHARTS:
+        fig = go.Figure(spec)
+        _CHECKED_CHARTS.add(chart)
+        return fig
+    return go.Figure(spec, _validate=False)
 
 
 class PlayerVisualizations:
     """Create interactive visualizations for player stats"""
 
+    # Timeline traces are downsampled above this many games
+    MAX_TIMELINE_POINTS = 1000
+    # Per-game stats plotted as rolling averages on the timeline
+    TIMELINE_COLUMNS = ("goals", "assists", "saves")
+    ROLLING_WINDOW = 5
+    SCORE_BINS = 20
+
+    # Color scheme, shared by every instance
+    colors = {
+        "primary": "#1f77b4",
+        "secondary": "#ff7f0e",
+        "success": "#2ca02c",
+        "danger": "#d62728",
+        "warning": "#ff9800",
+        "info": "#17a2b8"
+    }
+
+    # Radar axes: label, summary key, scale onto 0-10, capped at RADAR_CAP
+    RADAR_CATEGORIES = ("Goals", "Assists", "Saves", "Shots", "Score/100")
+    RADAR_KEYS = ("avg_goals", "avg_assists", "avg_saves", "avg_shots", "avg_score")
+    RADAR_SCALE = np.array([2, 2, 2, 0.5, 0.01])
+    RADAR_CAP = 10.0
+    # Improvement bars: label, comparison key and display scale
+    IMPROVEMENT_METRICS = ("Goals", "Assists", "Saves", "Score/100", "Win Rate")
+    IMPROVEMENT_KEYS = ("goals_change", "assists_change", "saves_change", "score_change", "win_rate_change")
+    IMPROVEMENT_SCALE = np.array([1, 1, 1, 0.01, 1])
+
     def __init__(self, stats_df: pd.DataFrame, player_name: str):
         """
         Initialize with player stats
@@ -20,99 +153,113 @@ class PlayerVisualizations:
             stats_df: DataFrame from database
             player_name: Name of player for titles
         """
-        self.df = stats_df.sort_values("date")  # Sort chronologically
+        # Sort chronologically; the database returns newest first, so a
+        # reversed view usually suffices and a full sort is the fallback
+        dates = stats_df["date"]
+        if dates.is_monotonic_increasing:
+            self.df = stats_df
+        elif dates.is_monotonic_decreasing:
+            self.df = stats_df.iloc[::-1]
+        else:
+            self.df = stats_df.sort_values("date", kind="stable")
         self.player_name = player_name
 
-        # Color scheme
-        self.colors = {
-            "primary": "#1f77b4",
-            "secondary": "#ff7f0e",
-            "success": "#2ca02c",
-            "danger": "#d62728",
-            "warning": "#ff9800",
-            "info": "#17a2b8"
-        }
+        # Figures from create_all_visualizations, updated in place on rebuilds
+        self._figs: Dict[str, "go.Figure"] = {}
+        self._inputs_key = None  # hash of the inputs behind self._figs
+
+        # Columns and rolling averages extracted once, reused by every chart
+        self._xidx = np.arange(len(self.df), dtype=np.int32)  # game numbers
+        self._score = self.df["score"].to_numpy(dtype=float)
+        # All timeline stats are rolled together as one (games, stats) block
+        block = self.df[list(self.TIMELINE_COLUMNS)].to_numpy(dtype=float)
+        rolled = _rolling_mean(block, self.ROLLING_WINDOW)
+        self._rolling = dict(zip(self.TIMELINE_COLUMNS, rolled.T))
+
+    @property
+    def figures(self) -> Dict[str, "go.Figure"]:
+        """Figures built so far by create_all_visualizations, keyed by chart name"""
+        return dict(self._figs)
+
+    def _persist(self, name: str, fig: "go.Figure") -> "go.Figure":
+        """
+        Keep one Figure object per chart across rebuilds
 
-    def create_performance_timeline(self) -> go.Figure:
+        The first build is stored as is. Later builds copy their traces and
+        layout into the stored figure, so front ends holding it (e.g. a
+        FigureWidget or Plotly.react) diff and patch instead of replotting.
+        """
+        current = self._figs.get(name)
+        if current is None:
+            self._figs[name] = fig
+            return fig
+
+        current.data = []
+        current.add_traces(fig.data)
+        current.layout = fig.layout
+        return current
+
+    def _downsample(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Reduce a per-game series to at most MAX_TIMELINE_POINTS with LTTB"""
+        if len(values) <= self.MAX_TIMELINE_POINTS:
+            # Short series are plotted whole against the shared game index
+            return self._xidx, values
+        keep = _lttb_indices(values, self.MAX_TIMELINE_POINTS)
+        return keep, values[keep]
+
+    def create_performance_timeline(self) -> "go.Figure":
         """
         Line chart showing performance over time with rolling averages
         """
         if len(self.df) == 0:
-            return go.Figure()
-
-        # Calculate rolling averages
-        df = self.df.copy()
-        df["rolling_goals"] = df["goals"].rolling(window=5, min_periods=1).mean()
-        df["rolling_assists"] = df["assists"].rolling(window=5, min_periods=1).mean()
-        df["rolling_saves"] = df["saves"].rolling(window=5, min_periods=1).mean()
-
-        fig = go.Figure()
-
-        # Add traces
-        fig.add_trace(go.Scatter(
-            x=list(range(len(df))),
-            y=df["rolling_goals"],
-            mode='lines',
-            name='Goals',
-            line=dict(color=self.colors["primary"], width=2)
-        ))
-
-        fig.add_trace(go.Scatter(
-            x=list(range(len(df))),
-            y=df["rolling_assists"],
-            mode='lines',
-            name='Assists',
-            line=dict(color=self.colors["secondary"], width=2)
-        ))
-
-        fig.add_trace(go.Scatter(
-            x=list(range(len(df))),
-            y=df["rolling_saves"],
-            mode='lines',
-            name='Saves',
-            line=dict(color=self.colors["success"], width=2)
-        ))
-
-        fig.update_layout(
-            title=f"{self.player_name} - Performance Trend (5-Game Rolling Average)",
-            xaxis_title="Game Number",
-            yaxis_title="Average per Game",
-            hovermode='x unified',
+            return _figure()
+
+        # WebGL traces draw lines on the GPU instead of as SVG paths, which
+        # keeps long histories responsive (at the cost of fewer line styles).
+        # Rolling averages are precomputed in __init__.
+        data = []
+        for col, name, color in (("goals", "Goals", "primary"),
+                                 ("assists", "Assists", "secondary"),
+                                 ("saves", "Saves", "success")):
+            x, y = self._downsample(self._rolling[col])
+            data.append(dict(
+                type="scattergl",
+                x=x,
+                y=y,
+                mode="lines",
+                name=name,
+                line=dict(color=self.colors[color], width=2)
+            ))
+
+        return _figure(data, dict(
+            title=dict(text=f"{self.player_name} - Performance Trend (5-Game Rolling Average)"),
+            xaxis=dict(title=dict(text="Game Number")),
+            yaxis=dict(title=dict(text="Average per Game")),
+            hovermode="x unified",
             template="plotly_white",
-            height=400
-        )
+            height=400,
+            uirevision=self.player_name
+        ), chart="timeline")
 
-        return fig
-
-    def create_stats_radar(self, summary_stats: Dict) -> go.Figure:
+    def create_stats_radar(self, summary_stats: Dict) -> "go.Figure":
         """
         Radar chart comparing different stat categories
         """
         if not summary_stats:
-            return go.Figure()
+            return _figure()
 
         # Normalize stats to 0-10 scale for radar chart
-        categories = ['Goals', 'Assists', 'Saves', 'Shots', 'Score/100']
-
-        values = [
-            min(summary_stats.get("avg_goals", 0) * 2, 10),  # Scale goals
-            min(summary_stats.get("avg_assists", 0) * 2, 10),  # Scale assists
-            min(summary_stats.get("avg_saves", 0) * 2, 10),  # Scale saves
-            min(summary_stats.get("avg_shots", 0) / 2, 10),  # Scale shots
-            min(summary_stats.get("avg_score", 0) / 100, 10),  # Scale score
-        ]
-
-        fig = go.Figure()
+        raw = np.array([summary_stats.get(key, 0) for key in self.RADAR_KEYS], dtype=float)
+        values = np.minimum(raw * self.RADAR_SCALE, self.RADAR_CAP)
 
-        fig.add_trace(go.Scatterpolar(
+        return _figure([dict(
+            type="scatterpolar",
             r=values,
-            theta=categories,
-            fill='toself',
+            theta=self.RADAR_CATEGORIES,
+            fill="toself",
             name=self.player_name,
             line=dict(color=self.colors["primary"])
-        ))
-
-        fig.update_layout(
+        )], dict(
             polar=dict(
                 radialaxis=dict(
                     visible=True,
@@ -120,105 +267,116 @@ class PlayerVisualizations:
                 )
             ),
             showlegend=False,
-            title=f"{self.player_name} - Stat Profile",
-            height=400
-        )
-
-        return fig
+            title=dict(text=f"{self.player_name} - Stat Profile"),
+            height=400,
+            uirevision=self.player_name
+        ), chart="radar")
 
-    def create_win_loss_chart(self, summary_stats: Dict) -> go.Figure:
+    def create_win_loss_chart(self, summary_stats: Dict) -> "go.Figure":
         """
         Pie chart showing win/loss distribution
         """
         if not summary_stats:
-            return go.Figure()
+            return _figure()
 
         wins = summary_stats.get("wins", 0)
         losses = summary_stats.get("losses", 0)
 
-        fig = go.Figure(data=[go.Pie(
-            labels=['Wins', 'Losses'],
+        return _figure([dict(
+            type="pie",
+            labels=["Wins", "Losses"],
             values=[wins, losses],
             marker=dict(colors=[self.colors["success"], self.colors["danger"]]),
             hole=.3
-        )])
+        )], dict(
+            title=dict(text=f"{self.player_name} - Win/Loss Record"),
+            height=400,
+            uirevision=self.player_name
+        ), chart="win_loss")
 
-        fig.update_layout(
-            title=f"{self.player_name} - Win/Loss Record",
-            height=400
-        )
-
-        return fig
-
-    def create_playlist_comparison(self, playlist_stats: Dict) -> go.Figure:
+    def create_playlist_comparison(self, playlist_stats: Dict) -> "go.Figure":
         """
         Bar chart comparing performance across different playlists
         """
         if not playlist_stats:
-            return go.Figure()
+            return _figure()
 
+        # One walk over the playlists filling preallocated arrays
+        n = len(playlist_stats)
         playlists = list(playlist_stats.keys())
-        win_rates = [stats["win_rate"] for stats in playlist_stats.values()]
-        avg_goals = [stats["avg_goals"] for stats in playlist_stats.values()]
-        games = [stats["games"] for stats in playlist_stats.values()]
-
-        fig = make_subplots(
-            rows=1, cols=2,
-            subplot_titles=("Win Rate by Mode", "Avg Goals by Mode")
-        )
-
-        # Win rate bars
-        fig.add_trace(
-            go.Bar(
-                x=playlists,
-                y=win_rates,
-                name="Win Rate %",
-                marker_color=self.colors["primary"],
-                text=[f"{wr:.1f}%" for wr in win_rates],
-                textposition='outside'
-            ),
-            row=1, col=1
-        )
-
-        # Goals bars
-        fig.add_trace(
-            go.Bar(
-                x=playlists,
-                y=avg_goals,
-                name="Avg Goals",
-                marker_color=self.colors["secondary"],
-                text=[f"{g:.2f}" for g in avg_goals],
-                textposition='outside'
-            ),
-            row=1, col=2
+        win_rates = np.empty(n)
+        avg_goals = np.empty(n)
+        for i, stats in enumerate(playlist_stats.values()):
+            win_rates[i] = stats["win_rate"]
+            avg_goals[i] = stats["avg_goals"]
+
+        # Both measures share the playlist axis: win rate on the left y-axis,
+        # goals on an overlaid right axis, bars side by side per playlist.
+        # Bar labels are formatted by numpy in one call per trace.
+        win_rate_bars = dict(
+            type="bar",
+            x=playlists,
+            y=win_rates,
+            name="Win Rate %",
+            marker=dict(color=self.colors["primary"]),
+            text=np.char.add(np.char.mod("%.1f", win_rates), "%"),
+            textposition="outside",
+            offsetgroup="0",
+            yaxis="y"
         )
-
-        fig.update_layout(
-            title=f"{self.player_name} - Performance by Game Mode",
-            showlegend=False,
-            height=400
+        goals_bars = dict(
+            type="bar",
+            x=playlists,
+            y=avg_goals,
+            name="Avg Goals",
+            marker=dict(color=self.colors["secondary"]),
+            text=np.char.mod("%.2f", avg_goals),
+            textposition="outside",
+            offsetgroup="1",
+            yaxis="y2"
         )
 
-        fig.update_xaxes(tickangle=45)
-
-        return fig
-
-    def create_score_distribution(self) -> go.Figure:
+        return _figure([win_rate_bars, goals_bars], dict(
+            title=dict(text=f"{self.player_name} - Performance by Game Mode"),
+            barmode="group",
+            xaxis=dict(tickangle=45),
+            yaxis=dict(title=dict(text="Win Rate %")),
+            yaxis2=dict(title=dict(text="Avg Goals"), overlaying="y", side="right", showgrid=False),
+            legend=dict(orientation="h", y=1.1),
+            height=400,
+            uirevision=self.player_name
+        ), chart="playlist")
+
+    def create_score_distribution(self) -> "go.Figure":
         """
         Histogram showing score distribution
         """
         if len(self.df) == 0:
-            return go.Figure()
-
-        fig = go.Figure(data=[go.Histogram(
-            x=self.df["score"],
-            nbinsx=20,
-            marker_color=self.colors["info"],
+            return _figure()
+
+        # Bin on the server so only the bin counts are sent, not every score
+        scores = self._score[~np.isnan(self._score)]
+        counts, edges = np.histogram(scores, bins=self.SCORE_BINS)
+        centers = (edges[:-1] + edges[1:]) / 2
+
+        fig = _figure([dict(
+            type="bar",
+            x=centers,
+            y=counts,
+            width=edges[1] - edges[0],
+            marker=dict(color=self.colors["info"]),
             name="Games"
-        )])
+        )], dict(
+            title=dict(text=f"{self.player_name} - Score Distribution"),
+            xaxis=dict(title=dict(text="Score")),
+            yaxis=dict(title=dict(text="Number of Games")),
+            template="plotly_white",
+            height=400,
+            uirevision=self.player_name
+        ), chart="score_dist")
 
         # Add mean line
-        mean_score = self.df["score"].mean()
+        mean_score = float(scores.mean()) if scores.size else np.nan
         fig.add_vline(
             x=mean_score,
             line_dash="dash",
@@ -227,64 +385,62 @@ class PlayerVisualizations:
             annotation_position="top"
         )
 
-        fig.update_layout(
-            title=f"{self.player_name} - Score Distribution",
-            xaxis_title="Score",
-            yaxis_title="Number of Games",
-            template="plotly_white",
-            height=400
-        )
-
         return fig
 
-    def create_improvement_chart(self, comparison: Dict) -> go.Figure:
+    def create_improvement_chart(self, comparison: Dict) -> "go.Figure":
         """
         Bar chart showing improvement between early and recent games
         """
         if not comparison:
-            return go.Figure()
+            return _figure()
 
         improvements = comparison.get("improvement", {})
 
-        metrics = ['Goals', 'Assists', 'Saves', 'Score/100', 'Win Rate']
-        changes = [
-            improvements.get("goals_change", 0),
-            improvements.get("assists_change", 0),
-            improvements.get("saves_change", 0),
-            improvements.get("score_change", 0) / 100,
-            improvements.get("win_rate_change", 0)
-        ]
+        raw = np.array([improvements.get(key, 0) for key in self.IMPROVEMENT_KEYS], dtype=float)
+        changes = raw * self.IMPROVEMENT_SCALE
 
-        colors = [self.colors["success"] if c > 0 else self.colors["danger"] for c in changes]
+        colors = np.where(changes > 0, self.colors["success"], self.colors["danger"]).tolist()
 
-        fig = go.Figure(data=[go.Bar(
-            x=metrics,
+        return _figure([dict(
+            type="bar",
+            x=self.IMPROVEMENT_METRICS,
             y=changes,
-            marker_color=colors,
-            text=[f"{c:+.2f}" for c in changes],
-            textposition='outside'
-        )])
-
-        fig.add_hline(y=0, line_dash="dash", line_color="gray")
-
-        fig.update_layout(
-            title=f"{self.player_name} - Improvement Over Time",
-            yaxis_title="Change (Recent vs Early Games)",
+            marker=dict(color=colors),
+            text=np.char.mod("%+.2f", changes),
+            textposition="outside"
+        )], dict(
+            title=dict(text=f"{self.player_name} - Improvement Over Time"),
+            yaxis=dict(title=dict(text="Change (Recent vs Early Games)")),
+            # Dashed zero line across the full plot width
+            shapes=[dict(
+                type="line",
+                xref="x domain", x0=0, x1=1,
+                yref="y", y0=0, y1=0,
+                line=dict(color="gray", dash="dash")
+            )],
             template="plotly_white",
-            height=400
-        )
-
-        return fig
+            height=400,
+            uirevision=self.player_name
+        ), chart="improvement")
 
     def create_all_visualizations(self, summary_stats: Dict, playlist_stats: Dict, comparison: Dict) -> Dict[
-        str, go.Figure]:
+        str, "go.Figure"]:
         """
         Generate all visualizations at once
 
+        Calling this again on the same instance updates the previously
+        returned figures in place rather than handing back new objects, and
+        skips rebuilding entirely when the inputs are unchanged.
+
         Returns:
             Dictionary of figure objects
         """
-        return {
+        # self.df is fixed per instance, so the stat dicts are the only inputs
+        key = self._inputs_hash(summary_stats, playlist_stats, comparison)
+        if key == self._inputs_key:
+            return self.figures
+
+        built = {
             "timeline": self.create_performance_timeline(),
             "radar": self.create_stats_radar(summary_stats),
             "win_loss": self.create_win_loss_chart(summary_stats),
@@ -292,15 +448,42 @@ class PlayerVisualizations:
             "score_dist": self.create_score_distribution(),
             "improvement": self.create_improvement_chart(comparison)
         }
+        figures = {name: self._persist(name, fig) for name, fig in built.items()}
+        self._inputs_key = key
+        return figures
+
+    def create_all_json(self, summary_stats: Dict, playlist_stats: Dict, comparison: Dict) -> Dict[str, str]:
+        """
+        Generate all visualizations as serialized JSON strings
+
+        For consumers that ship figures straight to the browser (e.g. an API
+        or Plotly.react). Serialization skips validation and uses the fastest
+        available engine; each chart's structure is schema-checked once, on
+        its first build (see _figure), and later builds are not validated.
+
+        Returns:
+            Dictionary of figure JSON strings, same keys as
+            create_all_visualizations
+        """
+        import plotly.io as pio
+
+        figures = self.create_all_visualizations(summary_stats, playlist_stats, comparison)
+        return {name: pio.to_json(fig, validate=False) for name, fig in figures.items()}
+
+    @staticmethod
+    def _inputs_hash(*inputs) -> str:
+        """Stable digest of the stat dictionaries a figure set is built from"""
+        payload = json.dumps(inputs, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
 
 
 # Example usage
 if __name__ == "__main__":
-    from database import RocketLeagueDB
-    from analytics import PlayerAnalytics
+    from src.database import RocketLeagueDB
+    from src.analytics import PlayerAnalytics
 
     # Load data
-    db = RocketLeagueDB(db_path="../data/rl_stats.db")
+    db = RocketLeagueDB(db_path="data/rl_stats.db")
     stats_df = db.get_player_stats("Squishy")
 
     # Create analytics